@@ -20,6 +20,7 @@ from lightautoml_gpu.automl.presets.tabular_presets import TabularUtilizedAutoML
 from lightautoml_gpu.dataset.gpu.gpu_dataset import CudfDataset
 from lightautoml_gpu.dataset.gpu.gpu_dataset import CupyDataset
 from lightautoml_gpu.dataset.gpu.gpu_dataset import DaskCudfDataset
+from lightautoml_gpu.dataset.gpu.gpu_dataset import enable_rmm_pool
 from lightautoml_gpu.dataset.np_pd_dataset import NumpyDataset
 from lightautoml_gpu.ml_algo.gpu.boost_cb_gpu import BoostCBGPU
 from lightautoml_gpu.ml_algo.gpu.boost_pb_gpu import BoostPB
@@ -135,6 +136,9 @@ class TabularAutoMLGPU(TabularAutoML):
             self.__dict__[name] = upd_params(self.__dict__[name], param)
         self.client = client
 
+        if self.general_params.get("use_rmm_pool", False):
+            enable_rmm_pool()
+
     def infer_auto_params(self, train_data: DataFrame, multilevel_avail: bool = False):
 
         if torch.cuda.device_count() == 1:
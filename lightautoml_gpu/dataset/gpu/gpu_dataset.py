@@ -1,7 +1,10 @@
 """Internal representation of dataset in cudf formats."""
 
-from copy import copy, deepcopy
+from copy import copy
+from functools import lru_cache
 from typing import Any
+from typing import Dict
+from typing import FrozenSet
 from typing import List
 from typing import Optional
 from typing import Sequence
@@ -13,10 +16,10 @@ from typing import Callable
 import warnings
 
 import numpy as np
-import pandas as pd
 
 import cudf
 import cupy as cp
+import dask
 import dask_cudf
 from cudf.core.dataframe import DataFrame
 from cudf.core.series import Series
@@ -50,6 +53,542 @@ RowSlice = Optional[Union[Sequence[int], Sequence[bool]]]
 ColSlice = Optional[Union[Sequence[str], str]]
 
 
+@lru_cache(maxsize=128)
+def _common_dtype(dtypes: FrozenSet[Any]) -> np.dtype:
+    """Get common type of roles dtypes.
+
+    Datasets have only a few distinct sets of dtypes, so the result is cached.
+
+    Args:
+        dtypes: Set of roles dtypes.
+
+    Returns:
+        Common dtype.
+
+    """
+    return cp.find_common_type(list(dtypes), [])
+
+
+def _async_d2h(
+    arrays: Sequence[Optional[cp.ndarray]], n_streams: int = 4, pinned_limit: int = 2 ** 26
+) -> List[Optional[np.ndarray]]:
+    """Copy several cupy arrays to host at once.
+
+    Arrays up to ``pinned_limit`` bytes are copied into one pinned staging
+    buffer on a pool of non-blocking streams, then moved to regular host
+    memory, so results do not hold pinned memory. Larger arrays are copied
+    to regular host memory directly.
+
+    Args:
+        arrays: Sequence of cp.ndarray or ``None``.
+        n_streams: Max number of streams used for copying.
+        pinned_limit: Max size in bytes of array copied through pinned memory.
+
+    Returns:
+        List of np.ndarray (``None`` is kept as is).
+
+    """
+    arrays = [None if arr is None else cp.ascontiguousarray(arr) for arr in arrays]
+    staged = [i for i, arr in enumerate(arrays) if arr is not None and 0 < arr.nbytes <= pinned_limit]
+    res = [None] * len(arrays)
+
+    if staged:
+        # single pinned block with aligned parts for all staged arrays
+        sizes = [-(-arrays[i].nbytes // 256) * 256 for i in staged]
+        offsets = np.concatenate([[0], np.cumsum(sizes)]).astype(np.int64)
+        mem = cp.cuda.alloc_pinned_memory(int(offsets[-1]))
+
+        n_streams = max(min(n_streams, len(staged)), 1)
+        streams = [cp.cuda.Stream(non_blocking=True) for _ in range(n_streams)]
+        # non-blocking streams do not wait for the current one implicitly
+        ready = cp.cuda.get_current_stream().record()
+        for stream in streams:
+            stream.wait_event(ready)
+
+        for n, i in enumerate(staged):
+            arr = arrays[i]
+            res[i] = np.frombuffer(mem, arr.dtype, arr.size, int(offsets[n])).reshape(arr.shape)
+            arr.get(stream=streams[n % n_streams], out=res[i])
+
+    # large arrays are copied while staged copies are in flight
+    for i, arr in enumerate(arrays):
+        if arr is not None and res[i] is None:
+            res[i] = cp.asnumpy(arr)
+
+    if staged:
+        for stream in streams:
+            stream.synchronize()
+        for i in staged:
+            res[i] = res[i].copy()
+
+    return res
+
+
+class SeqIdx:
+    """Index of sequences stored as flat array of rows and offsets (CSR-like).
+
+    Sequence ``i`` consists of rows ``values[offsets[i]:offsets[i + 1]]``.
+
+    Args:
+        values: Rows of all sequences one after another.
+        offsets: Bounds of sequences in values, ``len(offsets) == n_seq + 1``.
+
+    """
+
+    def __init__(self, values: np.ndarray, offsets: np.ndarray):
+        self.values = values
+        self.offsets = offsets
+
+    @classmethod
+    def from_seqs(cls, seqs: Sequence[Sequence[int]]) -> "SeqIdx":
+        """Create index from any sequence of sequences of rows.
+
+        Args:
+            seqs: Ragged array, list of lists or 2d array.
+
+        Returns:
+            Sequences index.
+
+        """
+        if isinstance(seqs, SeqIdx):
+            return seqs
+
+        # sequences of equal length are already a flat array
+        if isinstance(seqs, np.ndarray) and seqs.ndim == 2 and seqs.dtype != object:
+            n, m = seqs.shape
+            return cls(seqs.ravel(), np.arange(n + 1, dtype=np.int64) * m)
+
+        lengths = np.fromiter((len(i) for i in seqs), dtype=np.int64, count=len(seqs))
+        offsets = np.zeros(len(lengths) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=offsets[1:])
+        if offsets[-1] == 0:
+            return cls(np.array([], dtype=np.int64), offsets)
+
+        values = np.concatenate([np.asarray(i) for i in seqs if len(i) > 0])
+        if values.dtype == object:
+            values = values.astype(np.int64)
+
+        return cls(values, offsets)
+
+    @property
+    def lengths(self) -> np.ndarray:
+        """Lengths of sequences."""
+        return np.diff(self.offsets)
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self.values[self.offsets[i]: self.offsets[i + 1]]
+
+    def __getitem__(self, k: Union[int, Sequence[int], slice]) -> Union[np.ndarray, "SeqIdx"]:
+        """Get rows of single sequence or index of subset of sequences.
+
+        Args:
+            k: Sequence number or sequence of numbers, mask, slice.
+
+        Returns:
+            Array of rows for int, new index otherwise.
+
+        """
+        if isinstance(k, (int, np.integer)):
+            if k < 0:
+                k += len(self)
+            return self.values[self.offsets[k]: self.offsets[k + 1]]
+
+        k = np.arange(len(self))[k]
+        starts = self.offsets[k]
+        lengths = self.offsets[k + 1] - starts
+        offsets = np.zeros(len(k) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=offsets[1:])
+        # position of each element of new sequences in old values
+        pos = np.arange(offsets[-1]) - np.repeat(offsets[:-1] - starts, lengths)
+
+        return SeqIdx(self.values[pos], offsets)
+
+
+def _as_seq_idx(idx: Any) -> Any:
+    """Store index of sequences as :class:`SeqIdx` when it contains only rows numbers.
+
+    Args:
+        idx: Ragged array, list of lists, 2d array or ``None``.
+
+    Returns:
+        :class:`SeqIdx` or input as is (e.g. if it has nan).
+
+    """
+    if idx is None or isinstance(idx, SeqIdx) or not isinstance(idx, (np.ndarray, list, tuple)):
+        return idx
+    try:
+        seq_idx = SeqIdx.from_seqs(idx)
+    except (TypeError, ValueError):
+        return idx
+
+    return seq_idx if seq_idx.values.dtype.kind in "iu" else idx
+
+
+def _first_rows(idx: Any, rows: Sequence[int]) -> np.ndarray:
+    """Get first row of each sequence.
+
+    Args:
+        idx: Index of sequences.
+        rows: Sequences numbers.
+
+    Returns:
+        First rows, nan for empty sequences if idx is :class:`SeqIdx`.
+
+    """
+    if not isinstance(idx, SeqIdx):
+        return np.array([idx[i][0] for i in rows])
+
+    rows = np.asarray(rows, dtype=np.int64)
+    starts = idx.offsets[rows]
+    empty = idx.offsets[rows + 1] == starts
+    if not empty.any():
+        return idx.values[starts]
+
+    first = np.full(len(rows), np.nan)
+    first[~empty] = idx.values[starts[~empty]]
+
+    return first
+
+
+_SEQ_REDUCTIONS = {cp.sum: "sum", cp.mean: "mean", cp.std: "std", cp.max: "max", cp.min: "min"}
+
+
+def _seq_reduce(data: cp.ndarray, seq_idx: SeqIdx, how: str) -> cp.ndarray:
+    """Reduce all values of each sequence without a loop over sequences.
+
+    Same as applying ``cp.<how>`` to ``data[seq_idx[i]]`` for each sequence:
+    rows are reduced over columns first, then over sequences by groupby.
+
+    Args:
+        data: 2d array of data.
+        seq_idx: Index of sequences.
+        how: One of ``'sum'``, ``'mean'``, ``'std'``, ``'max'``, ``'min'``.
+
+    Returns:
+        1d array of results for each sequence.
+
+    """
+    n_seq = len(seq_idx)
+    values = data[cp.asarray(seq_idx.values)]
+    seq = cp.asarray(np.repeat(np.arange(n_seq), seq_idx.lengths))
+    frame = cudf.DataFrame({"seq": seq, "nan": cp.isnan(values).any(axis=1)})
+    aggs = {"nan": "max"}
+    if how in ("max", "min"):
+        frame["val"] = getattr(values, how)(axis=1)
+        aggs["val"] = how
+    else:
+        frame["val"] = values.sum(axis=1, dtype=cp.float64 if how == "std" else None)
+        aggs["val"] = "sum"
+
+    # empty sequences are missed by groupby
+    res = frame.groupby("seq").agg(aggs).reindex(np.arange(n_seq))
+    val = res["val"].to_cupy(na_value=0 if how in ("sum", "mean", "std") else cp.nan)
+
+    if how in ("mean", "std"):
+        size = cp.asarray(seq_idx.lengths * data.shape[1])
+        val = val / size
+        if how == "std":
+            # second pass over deviations from the sequence mean,
+            # sum of squares minus squared mean loses precision on large offsets
+            dev = ((values.astype(cp.float64) - val[seq][:, None]) ** 2).sum(axis=1)
+            sq = cudf.DataFrame({"seq": seq, "sq": dev}).groupby("seq").sum().reindex(np.arange(n_seq))
+            val = cp.sqrt(sq["sq"].to_cupy(na_value=0) / size)
+
+    # nans are propagated like in cupy reductions
+    return cp.where(res["nan"].fillna(False).to_cupy(), cp.nan, val)
+
+
+def _apply_seqs(data: DataFrame, seqs: Sequence[np.ndarray], func: Callable) -> List[Any]:
+    """Apply function to sequences of rows of table.
+
+    Args:
+        data: Table, that contains all rows of the sequences.
+        seqs: Positions of rows of each sequence in the table.
+        func: Any callable function.
+
+    Returns:
+        List of results for each sequence.
+
+    """
+    values = data.values
+
+    return [func(values[seq]) for seq in seqs]
+
+
+def _gather_seq_idx(seq_idx: Sequence[Sequence[int]]) -> Tuple[np.ndarray, SeqIdx]:
+    """Get data rows used by the sequences and their new sequential index.
+
+    Args:
+        seq_idx: Sequence of data rows indexes for each sequence.
+
+    Returns:
+        Sorted unique data rows and index of the sequences
+        in the data sliced by these rows.
+
+    """
+    seq_idx = SeqIdx.from_seqs(seq_idx)
+    rows = np.unique(seq_idx.values).astype(np.int64)
+    idx_new = SeqIdx(np.arange(len(seq_idx.values)), seq_idx.offsets)
+
+    return rows, idx_new
+
+
+def _from_cudf(data: FrameOrSeries, npartitions: int) -> FrameOrSeries_dask:
+    """Create dask_cudf collection from cudf object.
+
+    Single partition is made by wrapping the object as is, without
+    sorting and splitting done by ``dask_cudf.from_cudf``.
+
+    Args:
+        data: cudf DataFrame or Series.
+        npartitions: Number of partitions.
+
+    Returns:
+        dask_cudf DataFrame or Series.
+
+    """
+    if npartitions != 1:
+        return dask_cudf.from_cudf(data, npartitions=npartitions)
+
+    divisions = None
+    if len(data) > 0 and data.index.is_monotonic_increasing:
+        divisions = (data.index[0], data.index[-1])
+
+    return dask_cudf.from_delayed([dask.delayed(data)], meta=data.head(0), divisions=divisions)
+
+
+def enable_rmm_pool(cupy_allocator: bool = False):
+    """Use RMM pool for cudf allocations in this process.
+
+    Not called by datasets, GPU presets call it if ``use_rmm_pool``
+    general param is set. Pool is created only over the default allocator,
+    so memory resource set by user (e.g. managed memory) is kept.
+    Pool starts empty and grows on demand.
+
+    Args:
+        cupy_allocator: Also route cupy allocations through RMM.
+
+    """
+    import rmm
+
+    mr = rmm.mr.get_current_device_resource()
+    if type(mr) is rmm.mr.CudaMemoryResource:
+        rmm.mr.set_current_device_resource(rmm.mr.PoolMemoryResource(mr, initial_pool_size=0))
+
+    if cupy_allocator:
+        try:
+            from rmm.allocators.cupy import rmm_cupy_allocator
+        except ImportError:
+            rmm_cupy_allocator = rmm.rmm_cupy_allocator
+        cp.cuda.set_allocator(rmm_cupy_allocator)
+
+
+def _collect_attrs(datasets: Sequence[LAMLDataset]) -> Dict[str, Any]:
+    """Get array like attributes of datasets, first occurrence wins.
+
+    Args:
+        datasets: Sequence of datasets.
+
+    Returns:
+        Dict of attributes.
+
+    """
+    attrs = {}
+    for ds in datasets:
+        attrs.update({x: ds.__dict__[x] for x in ds._array_like_attrs if x not in attrs})
+
+    return attrs
+
+
+def _cast_partition(
+    data: DataFrame, dtypes: Dict[str, Any], date_cols: List[str], convert_datetime: Callable
+) -> DataFrame:
+    """Cast columns of partition and convert dates.
+
+    Args:
+        data: Partition of dask_cudf DataFrame.
+        dtypes: Dtypes of non datetime columns.
+        date_cols: Datetime columns.
+        convert_datetime: Function to convert datetime columns.
+
+    Returns:
+        Converted partition.
+
+    Raises:
+        TypeError: If column can not be cast to non numeric dtype.
+        ValueError: If column can not be cast to non numeric dtype.
+
+    """
+    try:
+        data = data.astype(dtypes)
+    except (TypeError, ValueError):
+        # values, that can not be cast to numeric dtype, are set to nulls,
+        # so all the partitions have dtypes of meta
+        data = data.copy(deep=False)
+        for col, dtype in dtypes.items():
+            try:
+                data[col] = data[col].astype(dtype)
+            except (TypeError, ValueError):
+                if not cudf.api.types.is_numeric_dtype(dtype):
+                    raise
+                data[col] = cudf.to_numeric(data[col], errors="coerce").astype(dtype)
+
+    return convert_datetime(data, date_cols)
+
+
+def _concat_columns(*parts: DataFrame) -> DataFrame:
+    """Concat aligned partitions by columns.
+
+    Args:
+        *parts: Partitions with same index.
+
+    Returns:
+        Concatenated partition.
+
+    """
+    return cudf.concat(list(parts), axis=1)
+
+
+def _same_rows(data: FrameOrSeries, attr: FrameOrSeries) -> bool:
+    """Check if partitions have same rows in same order.
+
+    Args:
+        data: Partition of dask_cudf DataFrame.
+        attr: Partition of array like attr.
+
+    Returns:
+        ``True`` if index of partitions is equal.
+
+    """
+    return len(data) == len(attr) and data.index.equals(attr.index)
+
+
+def _position_index(data: DataFrame, offsets: np.ndarray, partition_info: Optional[dict] = None) -> DataFrame:
+    """Replace index of partition with positions of its rows.
+
+    Args:
+        data: Partition of dask_cudf DataFrame.
+        offsets: Positions of first rows of partitions.
+        partition_info: Partition number, passed by ``map_partitions``.
+
+    Returns:
+        Partition with ``RangeIndex`` of positions.
+
+    """
+    start = 0 if partition_info is None else offsets[partition_info["number"]]
+    data = data.copy(deep=False)
+    data.index = cudf.RangeIndex(start, start + len(data), name="index")
+
+    return data
+
+
+def _position_map(data: DataFrame, offsets: np.ndarray, partition_info: Optional[dict] = None) -> DataFrame:
+    """Get positions of partition rows indexed by partition index.
+
+    Args:
+        data: Partition of dask_cudf DataFrame.
+        offsets: Positions of first rows of partitions.
+        partition_info: Partition number, passed by ``map_partitions``.
+
+    Returns:
+        Table with column ``index`` of positions.
+
+    """
+    start = 0 if partition_info is None else offsets[partition_info["number"]]
+
+    return cudf.DataFrame({"index": cp.arange(start, start + len(data), dtype=np.int64)}, index=data.index)
+
+
+def _partition_offsets(data: FrameOrSeries_dask) -> np.ndarray:
+    """Get positions of first rows of partitions.
+
+    Args:
+        data: dask_cudf DataFrame or Series.
+
+    Returns:
+        Offsets of partitions, ``len(offsets) == npartitions + 1``.
+
+    """
+    lens = data.map_partitions(len).compute().values
+
+    return np.concatenate([[0], np.cumsum(lens)]).astype(np.int64)
+
+
+def _take_rows(
+    positions: List[np.ndarray], order: np.ndarray, start: int, valid: Optional[np.ndarray], *parts: DataFrame
+) -> DataFrame:
+    """Gather rows of several partitions and restore their requested order.
+
+    Args:
+        positions: Positions of rows inside each partition.
+        order: Positions of gathered rows in the result.
+        start: Position of first row of the result.
+        valid: Mask of rows to keep, other rows are set to nulls.
+        *parts: Partitions of dask_cudf DataFrame.
+
+    Returns:
+        Gathered rows with ``RangeIndex`` of their positions.
+
+    """
+    data = cudf.concat([part.take(pos) for part, pos in zip(parts, positions)]).take(order)
+    data.index = cudf.RangeIndex(start, start + len(data), name=parts[0].index.name)
+    if valid is not None and not valid.all():
+        valid = cp.asarray(valid)
+        for col in data.columns:
+            data[col] = data[col].where(valid)
+
+    return data
+
+
+def _take_positions(
+    data: DataFrame_dask, positions: np.ndarray, valid: Optional[np.ndarray] = None
+) -> DataFrame_dask:
+    """Gather rows of dask_cudf DataFrame by their positions.
+
+    Rows are located by partitions lengths, so index labels are not used
+    and the order of positions is kept. Result has same number of partitions.
+
+    Args:
+        data: dask_cudf DataFrame.
+        positions: Positions of rows.
+        valid: Mask of rows to keep, other rows are set to nulls.
+
+    Returns:
+        dask_cudf DataFrame with ``RangeIndex`` of result positions.
+
+    """
+    positions = np.asarray(positions, dtype=np.int64)
+    if len(positions) == 0:
+        return _from_cudf(data._meta, 1)
+
+    offsets = _partition_offsets(data)
+    part = np.searchsorted(offsets[1:], positions, side="right")
+    local = positions - offsets[part]
+    parts = data.to_delayed()
+
+    chunks = [x for x in np.array_split(np.arange(len(positions)), data.npartitions) if len(x) > 0]
+    tasks = []
+    for chunk in chunks:
+        used = np.unique(part[chunk])
+        order = np.argsort(np.argsort(part[chunk], kind="stable"))
+        tasks.append(
+            dask.delayed(_take_rows)(
+                [local[chunk][part[chunk] == i] for i in used],
+                order,
+                chunk[0],
+                None if valid is None else valid[chunk],
+                *(parts[i] for i in used),
+            )
+        )
+    divisions = tuple(int(x[0]) for x in chunks) + (int(chunks[-1][-1]),)
+
+    return dask_cudf.from_delayed(tasks, meta=data._meta, divisions=divisions)
+
+
 class CupyDataset(NumpyDataset):
     """Dataset that contains info in cp.ndarray format.
 
@@ -91,7 +630,12 @@ class CupyDataset(NumpyDataset):
 
         self._initialize(task, **kwargs)
         for k in kwargs:
-            self.__dict__[k] = cp.asarray(kwargs[k])
+            val = kwargs[k]
+            if isinstance(val, (Series, DataFrame)):
+                val = val.to_cupy()
+            elif not isinstance(val, cp.ndarray):
+                val = cp.asarray(val)
+            self.__dict__[k] = val
         if data is not None:
             self.set_data(data, features, roles)
 
@@ -102,11 +646,21 @@ class CupyDataset(NumpyDataset):
             AttributeError: If there is non-numeric type in dataset.
 
         """
-        dtypes = list(set([i.dtype for i in self.roles.values()]))
-        self.dtype = cp.find_common_type(dtypes, [])
-
-        for f in self.roles:
-            self._roles[f].dtype = self.dtype
+        # fast path: data and roles still have the dtype found on the last check
+        uniform_dtype = getattr(self, "_uniform_dtype", None)
+        if (
+            uniform_dtype is not None
+            and self.data.dtype == uniform_dtype
+            and all((i.dtype == uniform_dtype for i in self._roles.values()))
+        ):
+            self.dtype = uniform_dtype
+            return
+
+        self.dtype = _common_dtype(frozenset((i.dtype for i in self._roles.values())))
+
+        for role in self._roles.values():
+            if role.dtype != self.dtype:
+                role.dtype = self.dtype
 
         assert cp.issubdtype(
             self.dtype, cp.number
@@ -115,6 +669,8 @@ class CupyDataset(NumpyDataset):
         if self.data.dtype != self.dtype:
             self.data = self.data.astype(self.dtype)
 
+        self._uniform_dtype = self.dtype
+
     def set_data(
         self, data: DenseSparseArray, features: NpFeatures = (), roles: NpRoles = None
     ):
@@ -140,9 +696,8 @@ class CupyDataset(NumpyDataset):
                 - dict.
 
         """
-        assert (
-            data is None or type(data) is cp.ndarray
-        ), "Cupy dataset support only cp.ndarray features"
+        if __debug__ and not (data is None or isinstance(data, cp.ndarray)):
+            raise TypeError("Cupy dataset support only cp.ndarray features")
         super(CupyDataset.__bases__[0], self).set_data(data, features, roles)
         self._check_dtype()
 
@@ -157,7 +712,14 @@ class CupyDataset(NumpyDataset):
             Stacked features array.
 
         """
-        return cp.hstack([data for data in datasets if len(data) > 0])
+        datasets = [data for data in datasets if len(data) > 0]
+        out = cp.empty(
+            (datasets[0].shape[0], sum((data.shape[1] for data in datasets))),
+            dtype=_common_dtype(frozenset((data.dtype for data in datasets))),
+            order="C",
+        )
+
+        return cp.concatenate(datasets, axis=1, out=out)
 
     def to_numpy(self) -> NumpyDataset:
         """Convert to numpy.
@@ -167,17 +729,15 @@ class CupyDataset(NumpyDataset):
         """
 
         assert all(
-            [self.roles[x].name == "Numeric" for x in self.features]
+            (self.roles[x].name == "Numeric" for x in self.features)
         ), "Only numeric data accepted in numpy dataset"
 
-        data = None if self.data is None else cp.asnumpy(self.data)
+        # data and target and etc .. are copied to host in one batch
+        data, *vals = _async_d2h([self.data] + [self.__dict__[x] for x in self._array_like_attrs])
+        params = dict(zip(self._array_like_attrs, vals))
 
         roles = self.roles
         features = self.features
-        # target and etc ..
-        params = dict(
-            ((x, cp.asnumpy(self.__dict__[x])) for x in self._array_like_attrs)
-        )
         task = self.task
 
         return NumpyDataset(data, features, roles, task, **params)
@@ -215,12 +775,9 @@ class CupyDataset(NumpyDataset):
         Returns:
             Same dataset in CudfDataset format.
         """
-        data = None if self.data is None else cudf.DataFrame()
-        if data is not None:
-            data_gpu = cudf.DataFrame()
-            for i, col in enumerate(self.features):
-                data_gpu[col] = cudf.Series(self.data[:, i], nan_as_null=False)
-            data = data_gpu
+        # data has a single common dtype after _check_dtype,
+        # so all the columns are imported from the array at once
+        data = None if self.data is None else cudf.DataFrame(self.data, columns=self.features, nan_as_null=False)
         roles = self.roles
         # target and etc ..
         params = dict(
@@ -248,7 +805,7 @@ class CupyDataset(NumpyDataset):
             Same dataset in CupySparseDataset format (CSR).
         """
         assert all(
-            [self.roles[x].name == "Numeric" for x in self.features]
+            (self.roles[x].name == "Numeric" for x in self.features)
         ), "Only numeric data accepted in sparse dataset"
         data = None if self.data is None else sparse_cupy.csr_matrix(self.data)
 
@@ -383,9 +940,8 @@ class CupySparseDataset(CupyDataset):
                 - ColumnRole - single role.
                 - dict.
         """
-        assert (
-            data is None or type(data) is sparse_cupy.csr_matrix
-        ), "CSRSparseDataset support only csr_matrix features"
+        if __debug__ and not (data is None or isinstance(data, sparse_cupy.csr_matrix)):
+            raise TypeError("CSRSparseDataset support only csr_matrix features")
         LAMLDataset.set_data(self, data, features, roles)
         self._check_dtype()
 
@@ -441,8 +997,12 @@ class CudfDataset(PandasDataset):
 
     @property
     def roles(self) -> RolesDict:
-        """Roles dict."""
-        return copy(self._roles)
+        """Roles dict.
+
+        Not a copy, it is rebuilt by the setter on each ``set_data``.
+
+        """
+        return self._roles
 
     @roles.setter
     def roles(self, val: NpRoles):
@@ -514,21 +1074,29 @@ class CudfDataset(PandasDataset):
             Data converted to datetime format from roles.
 
         """
+        # columns parsed the same way are converted with a single call
+        groups = {}
         for i in date_cols:
+            if data[i].dtype.kind == "M":
+                continue
             dt_role = self.roles[i]
-            if not data.dtypes[i] is np.datetime64:
-                if dt_role.unit is None:
-                    data[i] = cudf.to_datetime(
-                        data[i], format=dt_role.format, origin=dt_role.origin, cache=True
-                    )
-                else:
-                    data[i] = cudf.to_datetime(
-                        data[i],
-                        format=dt_role.format,
-                        unit=dt_role.unit,
-                        origin=dt_role.origin,
-                        cache=True,
-                    )
+            key = (dt_role.format, dt_role.unit, dt_role.origin, data[i].dtype)
+            groups.setdefault(key, []).append(i)
+
+        n = len(data)
+        for (fmt, unit, origin, _), cols in groups.items():
+            kwargs = {"format": fmt, "origin": origin, "cache": True}
+            if unit is not None:
+                kwargs["unit"] = unit
+
+            values = data[cols[0]] if len(cols) == 1 else cudf.concat([data[i] for i in cols], ignore_index=True)
+            values = cudf.to_datetime(values, **kwargs)
+
+            for j, i in enumerate(cols):
+                col = values.iloc[j * n: (j + 1) * n]
+                col.index = data.index
+                data[i] = col
+
         return data
 
     @staticmethod
@@ -598,7 +1166,13 @@ class CudfDataset(PandasDataset):
             val: Values to set.
 
         """
-        data.iloc[:, k] = val
+        # values are set positionally like with iloc, but avoiding the iloc setter
+        if isinstance(val, cp.ndarray):
+            val = cudf.Series(val, index=data.index, nan_as_null=False)
+        elif isinstance(val, Series) and not val.index.equals(data.index):
+            val = val.copy(deep=False)
+            val.index = data.index
+        data[data.columns[k]] = val
 
     def to_cupy(self) -> CupyDataset:
         """Convert to class:`NumpyDataset`.
@@ -617,7 +1191,8 @@ class CudfDataset(PandasDataset):
         if self.data is None:
             return CupyDataset(None, features, roles, task, **params)
 
-        return CupyDataset(cp.asarray(self.data.fillna(cp.nan).values),
+        # nulls are replaced while filling the dense array, no filled copy of the frame is made
+        return CupyDataset(self.data.to_cupy(na_value=cp.nan),
                            features, roles, task, **params)
 
     def to_numpy(self) -> NumpyDataset:
@@ -641,13 +1216,7 @@ class CudfDataset(PandasDataset):
         roles = self.roles
         task = self.task
 
-        params = dict(
-            (
-                (x, pd.Series(cp.asnumpy(self.__dict__[x].values))
-                 if len(self.__dict__[x].shape) == 1 else pd.DataFrame(cp.asnumpy(self.__dict__[x].values))
-                 ) for x in self._array_like_attrs
-            )
-        )
+        params = dict(((x, self.__dict__[x].to_pandas()) for x in self._array_like_attrs))
 
         return PandasDataset(data, roles, task, **params)
 
@@ -673,16 +1242,12 @@ class CudfDataset(PandasDataset):
         """
         data = None
         if self.data is not None:
-            data = dask_cudf.from_cudf(self.data, npartitions=nparts)
+            data = _from_cudf(self.data, nparts)
         roles = self.roles
         task = self.task
 
-        params = dict(
-            (
-                (x, dask_cudf.from_cudf(self.__dict__[x], npartitions=nparts))
-                for x in self._array_like_attrs
-            )
-        )
+        # attrs are wrapped as is, so their names, dtypes and index are kept
+        params = dict(((x, _from_cudf(self.__dict__[x], nparts)) for x in self._array_like_attrs))
 
         return DaskCudfDataset(data, roles, task, index_ok=index_ok, **params)
 
@@ -712,6 +1277,7 @@ class SeqCudfDataset(CudfDataset):
         """
         super()._initialize(task, **kwargs)
         self._idx = None
+        self._cols_idx = None
 
     @property
     def idx(self) -> Any:
@@ -731,7 +1297,7 @@ class SeqCudfDataset(CudfDataset):
             val: Some idx or ``None``.
 
         """
-        self._idx = val
+        self._idx = _as_seq_idx(val)
 
     def __init__(
         self,
@@ -757,6 +1323,7 @@ class SeqCudfDataset(CudfDataset):
     def set_data(self, data: DenseSparseArray, roles: NpRoles = None, idx: Optional[List] = None):
 
         super().set_data(data, None, roles)
+        self._cols_idx = None
         if idx is None:
             idx = np.arange(len(data)).reshape(-1, 1)
         self.idx = idx
@@ -775,11 +1342,15 @@ class SeqCudfDataset(CudfDataset):
             sequence of int indexes or single int.
 
         """
+        # columns lookup is built once per data
+        if self._cols_idx is None:
+            self._cols_idx = dict(((x, i) for i, x in enumerate(self.data.columns)))
+
         if type(columns) is str:
-            idx = self.data.columns.get_loc(columns)
+            idx = self._cols_idx[columns]
 
         else:
-            idx = self.data.columns.get_indexer(columns)
+            idx = np.fromiter((self._cols_idx[x] for x in columns), dtype=np.int64, count=len(columns))
 
         return idx
 
@@ -810,23 +1381,12 @@ class SeqCudfDataset(CudfDataset):
         if isinstance(rows, slice):
             is_slice = True
 
-        rows = [rows] if isinstance(rows, int) else np.arange(self.__len__()) if isinstance(rows, slice) else rows
-        temp_idx = self.idx[rows]
-        rows = []
-        idx_new = []
-        _c = 0
-        for i in temp_idx:
-            rows.extend(list(i))
-            idx_new.append(list(np.arange(len(i)) + _c))
-            _c += len(i)
-        idx_new = np.array(idx_new, dtype=object)
-
-        rows = np.array(sorted(list(set(rows))))
-
         if is_slice:
             idx_new = self.idx
             rows = np.arange(len(self.data))
         else:
+            rows = [rows] if isinstance(rows, int) else rows
+            rows, idx_new = _gather_seq_idx(self.idx[rows])
             warnings.warn(
                 "Resulted sequential dataset may have different structure. It's not recommended to slice new dataset (GPU)"
             )
@@ -888,20 +1448,26 @@ class SeqCudfDataset(CudfDataset):
             roles = dict(((x, self.roles[x]) for x in self.roles if x in cols))
         else:
             roles = self.roles
-            idx = self._get_cols_idx(self.data.columns)
+            idx = np.arange(len(self.data.columns))
 
-        data = self.data
-        if type(self.idx == np.ndarray) and (np.isnan(self.idx).any()):
-            data = cudf.concat([data, cudf.DataFrame([cp.nan])])
-            self.idx = np.nan_to_num(self.idx, nan=[-1])
-        first_frame_idx = [self.idx[i][0] for i in rows]
+        first_frame_idx = _first_rows(self.idx, rows)
+        nan_rows = None
+        if first_frame_idx.dtype.kind == "f":
+            nan_rows = np.isnan(first_frame_idx)
+            first_frame_idx = np.where(nan_rows, 0, first_frame_idx).astype(np.int64)
 
-        data = self._get_slice(data, (first_frame_idx, idx))
+        data = self._get_slice(self.data, (first_frame_idx, idx))
+
+        # rows of nan idx are nulls, set after the gather instead of adding a nan row to data
+        if nan_rows is not None and nan_rows.any():
+            valid = cp.asarray(~nan_rows)
+            for col in data.columns:
+                data[col] = data[col].where(valid)
 
         if rows is None:
-            dataset = CudfDataset(None, deepcopy(roles), task=self.task)
+            dataset = CudfDataset(None, {k: copy(v) for k, v in roles.items()}, task=self.task)
         else:
-            dataset = CudfDataset(data, deepcopy(roles), task=self.task)
+            dataset = CudfDataset(data, {k: copy(v) for k, v in roles.items()}, task=self.task)
         return dataset
 
     def apply_func(self, k: Tuple[RowSlice, ColSlice] = None, func: Callable = None) -> cudf.DataFrame:
@@ -930,19 +1496,19 @@ class SeqCudfDataset(CudfDataset):
 
         rows = [rows] if isinstance(rows, int) else np.arange(self.__len__()) if isinstance(rows, slice) else rows
 
-        # case when columns are defined
-        if cols is not None:
+        _d = self.data.values if cols is None else self.data[cols].values
 
-            # case when seqs have different shape, return array with arrays
-            data = []
-            _d = self.data[cols].values
-            for row in rows:
-                data.append(func(_d[self.idx[row]]))
-        else:
-            data = []
-            _d = self.data.values
-            for row in rows:
-                data.append(func(_d[self.idx[row]]))
+        # known reductions are computed for all sequences at once
+        how = _SEQ_REDUCTIONS.get(func)
+        if how is not None:
+            seq_idx = SeqIdx.from_seqs(self.idx)
+            if seq_idx.values.dtype.kind in "iu":
+                return cudf.DataFrame(_seq_reduce(_d, seq_idx[rows], how))
+
+        # case when seqs have different shape, return array with arrays
+        data = []
+        for row in rows:
+            data.append(func(_d[self.idx[row]]))
 
         return cudf.DataFrame(data)
 
@@ -1050,32 +1616,73 @@ class DaskCudfDataset(CudfDataset):
             roles = {}
         # parse parameters
         # check if target, group etc .. defined in roles
+        aligned = set()
         for f in roles:
             for k, r in zip(valid_array_attributes, array_attr_roles):
                 if roles[f].name == r:
                     kwargs[k] = data[f]
+                    aligned.add(k)
                     roles[f] = DropRole()
         if not index_ok:
-            size = len(data.index)
-            data["index"] = data.index
-            mapping = dict(zip(data.index.compute().values_host, np.arange(size)))
-            data["index"] = data["index"].map(mapping).persist()
-            data = data.set_index("index", drop=True, sorted=True)
-            if 'index' in data.columns.to_list():
-                data = data.drop(['index'], axis=1)
-            data = data.persist()
+            # attrs, that have same rows in same order in each partition as data,
+            # get positions of the same partitions, checked with partitions lengths in one compute
+            checked = [
+                val for val in kwargs if val not in aligned and kwargs[val].npartitions == data.npartitions
+            ]
+            parts = data.to_delayed()
+            checks = [
+                dask.delayed(all)(
+                    [dask.delayed(_same_rows)(x, y) for x, y in zip(parts, kwargs[val].to_delayed())]
+                )
+                for val in checked
+            ]
+            lens, *same = dask.compute(data.map_partitions(len), *checks)
+            aligned.update((val for val, ok in zip(checked, same) if ok))
+
+            # new index is a position of the row, computed on device from partitions lengths
+            lens = lens.values
+            offsets = np.concatenate([[0], np.cumsum(lens)]).astype(np.int64)
+            divisions = tuple(offsets[:-1]) + (offsets[-1] - 1,) if (lens > 0).all() else None
+            if len(aligned) < len(kwargs):
+                mapping = data.map_partitions(_position_map, offsets)
+            # index is replaced in place, so no index column is materialized
+            data = data.map_partitions(_position_index, offsets)
+            data = dask_cudf.from_delayed(data.to_delayed(), meta=data._meta, divisions=divisions)
             for val in kwargs:
+                if val in aligned:
+                    kwargs[val] = kwargs[val].map_partitions(_position_index, offsets)
+                    kwargs[val] = dask_cudf.from_delayed(
+                        kwargs[val].to_delayed(), meta=kwargs[val]._meta, divisions=divisions
+                    )
+                    continue
                 col_name = kwargs[val].name if isinstance(kwargs[val], dask_cudf.Series) else list(kwargs[val].columns)
-                kwargs[val] = kwargs[val].reset_index(drop=False)
-                kwargs[val]["index"] = kwargs[val]["index"].map(mapping).persist()
-                kwargs[val] = kwargs[val].set_index("index", drop=True, sorted=True)[
-                    col_name
-                ]
+                kwargs[val] = kwargs[val].to_frame() if isinstance(kwargs[val], dask_cudf.Series) else kwargs[val]
+                kwargs[val] = kwargs[val].merge(mapping, how="left", left_index=True, right_index=True)
+                # merge result has no global order, so rows are shuffled to partitions of data
+                kwargs[val] = kwargs[val].set_index("index", drop=True, divisions=divisions)
+                kwargs[val] = kwargs[val][col_name]
+            # data and attrs share the graph, so they are persisted in one call
+            data, *vals = dask.persist(data, *kwargs.values())
+            kwargs = dict(zip(kwargs, vals))
 
         self._initialize(task, **kwargs)
         if data is not None:
             self.set_data(data, data.columns, roles)
 
+    def _initialize(self, task: Optional[Task], **kwargs: Any):
+        """Initialize empty dataset with task and array like attributes.
+
+        Dask array like attributes are persisted in one call.
+
+        Args:
+            task: Task name for dataset.
+            **kwargs: 1d arrays like attrs like target, group etc.
+
+        """
+        keys = [x for x in kwargs if isinstance(kwargs[x], (dask_cudf.Series, dask_cudf.DataFrame))]
+        kwargs.update(zip(keys, dask.persist(*(kwargs[x] for x in keys))))
+        super()._initialize(task, **kwargs)
+
     def _check_dtype(self):
         """Check if dtype in .set_data is ok and cast if not."""
         date_columns = []
@@ -1086,28 +1693,15 @@ class DaskCudfDataset(CudfDataset):
             else:
                 self.dtypes[f] = self.roles[f].dtype
 
-        try:
-            self.data = self.data.astype(self.dtypes).persist()
-        except:
-            pass
-        # handle dates types
-
+        # cast and dates handling are done in one pass over partitions
+        meta = _cast_partition(self.data._meta, self.dtypes, date_columns, self._convert_datetime)
         self.data = self.data.map_partitions(
-            self._convert_datetime, date_columns, meta=self.data
+            _cast_partition, self.dtypes, date_columns, self._convert_datetime, meta=meta
         ).persist()
 
         for i in date_columns:
             self.dtypes[i] = np.datetime64
 
-    @staticmethod
-    def slice_cudf(data, rows, cols):
-        mini = data.index[0]
-        maxi = data.index[-1]
-        step = data.index[1] - data.index[0]
-        new_rows = [x for x in rows if x >= mini and x <= maxi]
-        inds = [int((x - mini) / step) for x in new_rows]
-        return data.iloc[inds, cols]
-
     def _get_slice(self, data: dask_cudf.DataFrame, k: Tuple[RowSlice, ColSlice]) -> dask_cudf.DataFrame:
         """Get 2d slice.
 
@@ -1165,8 +1759,8 @@ class DaskCudfDataset(CudfDataset):
         if isinstance(k, cp.ndarray):
             k = cp.asnumpy(k)
         if isinstance(k, slice):
-            return data.persist()
-        return data.loc[k].persist()
+            return data
+        return data.loc[k]
 
     def to_cudf(self) -> CudfDataset:
         """Convert to class:`CudfDataset`.
@@ -1174,13 +1768,12 @@ class DaskCudfDataset(CudfDataset):
         Returns:
             Same dataset in class:`CudfDataset` format.
         """
-        data = None
-        if self.data is not None:
-            data = self.data.compute()
         roles = self.roles
         task = self.task
 
-        params = dict(((x, self.__dict__[x].compute()) for x in self._array_like_attrs))
+        # data and attrs are gathered in one pass
+        data, *vals = dask.compute(self.data, *(self.__dict__[x] for x in self._array_like_attrs))
+        params = dict(zip(self._array_like_attrs, vals))
         return CudfDataset(data, roles, task, **params)
 
     def to_numpy(self) -> "NumpyDataset":
@@ -1239,18 +1832,48 @@ class DaskCudfDataset(CudfDataset):
             concatenated table.
 
         """
-        cols = []
-        res_datasets = []
-        for i, data in enumerate(datasets):
-            if data is not None:
-                cols.extend(data.columns)
-                res_datasets.append(data)
+        res_datasets = [x for x in datasets if x is not None]
+        if len(res_datasets) == 1:
+            return res_datasets[0]
+
+        # partitions of datasets with same known divisions are already aligned
+        first = res_datasets[0]
+        if first.known_divisions and all(x.divisions == first.divisions for x in res_datasets[1:]):
+            meta = cudf.concat([x._meta for x in res_datasets], axis=1)
+            return first.map_partitions(_concat_columns, *res_datasets[1:], meta=meta)
 
+        cols = [x for data in res_datasets for x in data.columns]
         res = dask_cudf.concat(res_datasets, axis=1)
         mapper = dict(zip(np.arange(len(cols)), cols))
         res = res.rename(columns=mapper)
         return res
 
+    @classmethod
+    def concat(cls, datasets: Sequence["LAMLDataset"]) -> "LAMLDataset":
+        """Concat multiple dataset.
+
+        Array like attributes of all datasets are set (and persisted) at once.
+
+        Args:
+            datasets: Sequence of datasets.
+
+        Returns:
+            Concated dataset.
+
+        """
+        for check in cls._concat_checks:
+            check(datasets)
+
+        dataset = copy(datasets[0])
+        dataset._initialize(datasets[0].task, **_collect_attrs(datasets))
+        features = [x for ds in datasets for x in ds.features]
+        roles = {k: v for ds in datasets for k, v in ds.roles.items()}
+
+        data = cls._hstack([ds.data for ds in datasets])
+        dataset.set_data(data, features, roles)
+
+        return dataset
+
     @staticmethod
     def from_dataset(
         dataset: "DaskCudfDataset", npartitions: int = 1, index_ok: bool = True
@@ -1293,6 +1916,8 @@ class SeqDaskCudfDataset(DaskCudfDataset):
         """
         super()._initialize(task, **kwargs)
         self._idx = None
+        self._data_len = None
+        self._cols_idx = None
 
     @property
     def idx(self) -> Any:
@@ -1312,7 +1937,7 @@ class SeqDaskCudfDataset(DaskCudfDataset):
             val: Some idx or ``None``.
 
         """
-        self._idx = val
+        self._idx = _as_seq_idx(val)
 
     def __init__(
         self,
@@ -1335,6 +1960,18 @@ class SeqDaskCudfDataset(DaskCudfDataset):
         if data is not None:
             self.set_idx(data, idx)
 
+    def set_data(self, data: DataFrame_dask, features: None, roles: RolesDict):
+        """Inplace set data, features, roles for empty dataset.
+
+        Args:
+            data: Table with features.
+            features: `None`, just for same interface.
+            roles: Dict with roles.
+
+        """
+        super().set_data(data, features, roles)
+        self._cols_idx = None
+
     def set_idx(self, data: DenseSparseArray, idx: Optional[List] = None):
         """Inplace set data, features, roles for empty dataset.
 
@@ -1347,11 +1984,24 @@ class SeqDaskCudfDataset(DaskCudfDataset):
         if idx is None:
             idx = np.arange(len(data)).reshape(-1, 1)
         self.idx = idx
+        self._data_len = None
         self._check_dtype()
 
     def __len__(self):
         return len(self.idx)
 
+    def _get_data_len(self) -> int:
+        """Get number of rows in data, computed once after ``set_idx``.
+
+        Returns:
+            Number of rows.
+
+        """
+        if self._data_len is None:
+            self._data_len = len(self.data)
+
+        return self._data_len
+
     def _get_cols_idx(self, columns: Union[Sequence[str], str]) -> Union[Sequence[int], int]:
         """Get numeric index of columns by column names.
 
@@ -1362,11 +2012,15 @@ class SeqDaskCudfDataset(DaskCudfDataset):
             sequence of int indexes or single int.
 
         """
+        # columns lookup is built once per data
+        if self._cols_idx is None:
+            self._cols_idx = dict(((x, i) for i, x in enumerate(self.data.columns)))
+
         if type(columns) is str:
-            idx = self.data.columns.get_loc(columns)
+            idx = self._cols_idx[columns]
 
         else:
-            idx = self.data.columns.get_indexer(columns)
+            idx = np.fromiter((self._cols_idx[x] for x in columns), dtype=np.int64, count=len(columns))
 
         return idx
 
@@ -1397,23 +2051,12 @@ class SeqDaskCudfDataset(DaskCudfDataset):
         if isinstance(rows, slice):
             is_slice = True
 
-        rows = [rows] if isinstance(rows, int) else np.arange(self.__len__()) if isinstance(rows, slice) else rows
-        temp_idx = self.idx[rows]
-        rows = []
-        idx_new = []
-        _c = 0
-        for i in temp_idx:
-            rows.extend(list(i))
-            idx_new.append(list(np.arange(len(i)) + _c))
-            _c += len(i)
-        idx_new = np.array(idx_new, dtype=object)
-
-        rows = np.array(sorted(list(set(rows))))
-
         if is_slice:
             idx_new = self.idx
-            rows = np.arange(len(self.data))
+            rows = np.arange(self._get_data_len())
         else:
+            rows = [rows] if isinstance(rows, int) else rows
+            rows, idx_new = _gather_seq_idx(self.idx[rows])
             warnings.warn(
                 "Resulted sequential dataset may have different structure. It's not recommended to slice new dataset"
             )
@@ -1476,21 +2119,22 @@ class SeqDaskCudfDataset(DaskCudfDataset):
             roles = dict(((x, self.roles[x]) for x in self.roles if x in cols))
         else:
             roles = self.roles
-            idx = self._get_cols_idx(self.data.columns)
+            idx = np.arange(len(self.data.columns))
 
-        data = self.data
-        if type(self.idx == np.ndarray) and (np.isnan(self.idx).any()):
-            size = len(data)
-            data = dask_cudf.concat([data, dask_cudf.from_cudf(cudf.DataFrame([cp.nan], index=[size]), npartitions=self.data.npartitions)])
-            data = data[data.columns[:-1]]
-            self.idx = np.nan_to_num(self.idx, nan=[-1])
-        first_frame_idx = [self.idx[i][0] for i in rows]
+        first_frame_idx = _first_rows(self.idx, rows)
+        nan_rows = None
+        if first_frame_idx.dtype.kind == "f":
+            nan_rows = np.isnan(first_frame_idx)
+            first_frame_idx = np.where(nan_rows, 0, first_frame_idx).astype(np.int64)
 
-        data = self._get_slice(data, (first_frame_idx, idx))
+        # idx holds positions of rows, rows of nan idx are set to nulls in place
+        data = _take_positions(
+            self.data[self.data.columns[idx]], first_frame_idx, None if nan_rows is None else ~nan_rows
+        )
         if rows is None:
-            dataset = DaskCudfDataset(None, deepcopy(roles), task=self.task)
+            dataset = DaskCudfDataset(None, {k: copy(v) for k, v in roles.items()}, task=self.task)
         else:
-            dataset = DaskCudfDataset(data, deepcopy(roles), task=self.task)
+            dataset = DaskCudfDataset(data, {k: copy(v) for k, v in roles.items()}, task=self.task)
         return dataset
 
     def apply_func(self, k: Tuple[RowSlice, ColSlice] = None, func: Callable = None) -> dask_cudf.DataFrame:
@@ -1519,18 +2163,52 @@ class SeqDaskCudfDataset(DaskCudfDataset):
 
         rows = [rows] if isinstance(rows, int) else np.arange(self.__len__()) if isinstance(rows, slice) else rows
 
-        # case when columns are defined
-        if cols is not None:
-
-            data = []
-            _d = self.data[cols].values
-            for row in rows:
-                data.append(func(_d[self.idx[row]].compute()))
-        else:
-            data = []
-            _d = self.data.values
-            for row in rows:
-                data.append(func(_d[self.idx[row]].compute()))
+        seq_idx = SeqIdx.from_seqs(self.idx)[rows]
+        _d = self.data if cols is None else self.data[cols]
+
+        # idx holds positions of rows, they are located in partitions by partitions lengths
+        offsets = _partition_offsets(_d)
+        part = np.searchsorted(offsets[1:], seq_idx.values, side="right")
+        local = seq_idx.values - offsets[part]
+
+        # sequences with all rows in one partition are processed by the task of this partition,
+        # the rest - by a single task over their rows, empty ones go to the first partition
+        non_empty = seq_idx.lengths > 0
+        seq_part = np.zeros(len(seq_idx), dtype=np.int64)
+        if non_empty.any():
+            starts = seq_idx.offsets[:-1][non_empty]
+            same = np.minimum.reduceat(part, starts) == np.maximum.reduceat(part, starts)
+            seq_part[non_empty] = np.where(same, part[starts], -1)
+
+        parts = _d.to_delayed()
+        tasks = []
+        groups = []
+        for i in np.unique(seq_part):
+            sel = np.flatnonzero(seq_part == i)
+            if i >= 0:
+                seqs = [local[seq_idx.offsets[j]: seq_idx.offsets[j + 1]] for j in sel]
+                tasks.append(dask.delayed(_apply_seqs)(parts[i], seqs, func))
+            else:
+                used_rows = np.unique(seq_idx[sel].values)
+                used_part = np.searchsorted(offsets[1:], used_rows, side="right")
+                used_parts = np.unique(used_part)
+                # sorted rows are gathered partition by partition, so their order is kept
+                rows_frame = dask.delayed(_take_rows)(
+                    [used_rows[used_part == p] - offsets[p] for p in used_parts],
+                    np.arange(len(used_rows)),
+                    0,
+                    None,
+                    *(parts[p] for p in used_parts),
+                )
+                seqs = [np.searchsorted(used_rows, seq_idx[j]) for j in sel]
+                tasks.append(dask.delayed(_apply_seqs)(rows_frame, seqs, func))
+            groups.append(sel)
+
+        # all tasks are computed in one pass
+        data = [None] * len(seq_idx)
+        for sel, res in zip(groups, dask.compute(*tasks)):
+            for j, val in zip(sel, res):
+                data[j] = val
 
         return dask_cudf.from_cudf(cudf.DataFrame(data), npartitions=self.data.npartitions)
 
@@ -1568,23 +2246,11 @@ class SeqDaskCudfDataset(DaskCudfDataset):
             check(datasets)
 
         idx = datasets[0].idx
-        dataset = datasets[0].empty()
-        data = []
-        features = []
-        roles = {}
+        dataset = copy(datasets[0])
+        dataset._initialize(datasets[0].task, **_collect_attrs(datasets))
+        roles = {k: v for ds in datasets for k, v in ds.roles.items()}
 
-        atrs = set(dataset._array_like_attrs)
-        for ds in datasets:
-            data.append(ds.data)
-            features.extend(ds.features)
-            roles = {**roles, **ds.roles}
-            for atr in ds._array_like_attrs:
-                if atr not in atrs:
-                    dataset._array_like_attrs.append(atr)
-                    dataset.__dict__[atr] = ds.__dict__[atr]
-                    atrs.update({atr})
-
-        data = cls._hstack(data)
+        data = cls._hstack([ds.data for ds in datasets])
         dataset.set_data(data, None, roles)
         dataset.set_idx(data, idx)
 
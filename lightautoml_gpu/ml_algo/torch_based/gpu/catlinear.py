@@ -65,7 +65,10 @@ class CatLinear(nn.Module):
         x = self.bias
 
         if self.linear is not None:
-            x = x + self.linear(numbers)
+            if numbers.layout == torch.strided:
+                x = x + self.linear(numbers)
+            else:
+                x = x + torch.sparse.mm(numbers, self.linear.weight.t())
 
         if self.cat_params is not None:
             x = x + self.cat_params[categories + self.embed_idx].sum(dim=1)
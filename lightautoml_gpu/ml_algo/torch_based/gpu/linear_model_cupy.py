@@ -1,13 +1,14 @@
 """Linear models based on Torch library."""
 
 import logging
-from typing import Callable, Optional, Sequence, Union
-
-from copy import deepcopy
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import Callable, Optional, Sequence, Tuple, Union
 
 import cupy as cp
 import numpy as np
 import torch
+import torch.utils.dlpack
 from cupyx.scipy import sparse as sparse_cupy
 from torch import nn, optim
 
@@ -20,12 +21,17 @@ from .catlinear import CatMulticlass
 logger = logging.getLogger(__name__)
 ArrayOrSparseMatrix = Union[cp.ndarray, sparse_cupy.spmatrix]
 
+# CSR tensors exist since torch 1.10, but their autograd in sparse.mm is stable only since 1.13
+_TORCH_SPARSE_CSR = tuple(int(x) for x in torch.__version__.split("+")[0].split(".")[:2]) >= (1, 13)
+
 
 def convert_cupy_scipy_sparse_to_torch_float(
     matrix: sparse_cupy.spmatrix, dev_id: int
 ) -> torch.Tensor:
     """Convert scipy sparse matrix to torch sparse tensor (GPU version).
 
+    CSR layout is used for torch 1.13+, COO otherwise.
+
     Args:
         matrix: Matrix to convert.
 
@@ -33,15 +39,86 @@ def convert_cupy_scipy_sparse_to_torch_float(
         Matrix in torch.Tensor format.
 
    """
-    matrix = sparse_cupy.coo_matrix(matrix, dtype=np.float32)
-    cp_idx = cp.stack([matrix.row, matrix.col], axis=0).astype(cp.int64)
-    idx = torch.as_tensor(cp_idx, device=f"cuda:{dev_id}")
-    values = torch.as_tensor(matrix.data, device=f"cuda:{dev_id}")
-    sparse_tensor = torch.sparse_coo_tensor(idx, values, size=matrix.shape)
+    with cp.cuda.Device(dev_id):
+        if _TORCH_SPARSE_CSR:
+            matrix = matrix.tocsr()
+            # int32 indices are enough for most matrices and halve index traffic of SpMM
+            idx_dtype = cp.int32 if max(matrix.nnz, *matrix.shape) < 2 ** 31 else cp.int64
+            crow = torch.utils.dlpack.from_dlpack(matrix.indptr.astype(idx_dtype, copy=False).toDlpack())
+            col = torch.utils.dlpack.from_dlpack(matrix.indices.astype(idx_dtype, copy=False).toDlpack())
+            values = torch.utils.dlpack.from_dlpack(matrix.data.astype(cp.float32, copy=False).toDlpack())
+
+            return torch.sparse_csr_tensor(crow, col, values, size=matrix.shape).to(_cuda_device(dev_id))
+
+        matrix = matrix.tocoo()
+        # indices are cast while copied into single buffer, without stack temporaries
+        cp_idx = cp.empty((2, matrix.nnz), dtype=cp.int64)
+        cp.copyto(cp_idx[0], matrix.row, casting="unsafe")
+        cp.copyto(cp_idx[1], matrix.col, casting="unsafe")
+        values = matrix.data.astype(cp.float32, copy=False)
+
+        # zero copy exchange with torch
+        idx = torch.utils.dlpack.from_dlpack(cp_idx.toDlpack())
+        values = torch.utils.dlpack.from_dlpack(values.toDlpack())
+        sparse_tensor = torch.sparse_coo_tensor(idx, values, size=matrix.shape).to(_cuda_device(dev_id))
 
     return sparse_tensor
 
 
+@lru_cache(maxsize=None)
+def _cuda_device(dev_id: int) -> torch.device:
+    """Get torch device object, created once for each id.
+
+    Args:
+        dev_id: Device id.
+
+    Returns:
+        Torch CUDA device.
+
+    """
+    return torch.device("cuda", dev_id)
+
+
+def _cupy_to_torch(data: cp.ndarray, dtype: type, dev_id: int) -> torch.Tensor:
+    """Cast array (only if needed) and pass it to torch without copy.
+
+    Args:
+        data: Array to convert.
+        dtype: Required dtype.
+        dev_id: Device id.
+
+    Returns:
+        Tensor on given device.
+
+    """
+    data = cp.ascontiguousarray(data.astype(dtype, copy=False))
+
+    return torch.utils.dlpack.from_dlpack(data.toDlpack()).to(_cuda_device(dev_id))
+
+
+@contextmanager
+def _tf32_matmul(enabled: bool = True):
+    """Allow TF32 tensor cores in matmuls, previous setting is restored on exit.
+
+    Does nothing if not enabled or torch has no TF32 switch.
+
+    Args:
+        enabled: Allow TF32.
+
+    """
+    matmul = getattr(getattr(torch.backends, "cuda", None), "matmul", None)
+    if not enabled or not hasattr(matmul, "allow_tf32"):
+        yield
+        return
+
+    prev = matmul.allow_tf32
+    matmul.allow_tf32 = True
+    try:
+        yield
+    finally:
+        matmul.allow_tf32 = prev
+
+
 class TorchBasedLinearEstimator:
     """Linear model based on torch L-BFGS solver (GPU version).
 
@@ -77,6 +154,7 @@ class TorchBasedLinearEstimator:
         early_stopping: int = 2,
         loss=Optional[Callable],
         metric=Optional[Callable],
+        tf32: bool = False,
     ):
         """
         Args:
@@ -90,6 +168,7 @@ class TorchBasedLinearEstimator:
             early_stopping: Maximum rounds without improving.
             loss: Loss function. Format: loss(preds, true) -> loss_arr, assume ```reduction='none'```.
             metric: Metric function. Format: metric(y_true, y_preds, sample_weight = None) -> float (greater_is_better).
+            tf32: Allow TF32 matmuls while training and scoring.
 
         """
 
@@ -97,6 +176,7 @@ class TorchBasedLinearEstimator:
         self.categorical_idx = categorical_idx
         self.embed_sizes = embed_sizes
         self.output_size = output_size
+        self._n_num = data_size - len(categorical_idx["int"])
 
         assert all([x > 0 for x in cs]), "All Cs should be greater than 0"
 
@@ -106,6 +186,7 @@ class TorchBasedLinearEstimator:
         self.early_stopping = early_stopping
         self.loss = loss  # loss(preds, true) -> loss_arr, assume reduction='none'
         self.metric = metric  # metric(y_true, y_preds, sample_weight = None) -> float (greater_is_better)
+        self.tf32 = tf32
 
     def _prepare_data(self, data: ArrayOrSparseMatrix, dev_id: int = 0):
         """Prepare data based on input type.
@@ -131,7 +212,7 @@ class TorchBasedLinearEstimator:
             data: data to prepare.
 
         Returns:
-            Tuple (numeric_features, `None`).
+            Tuple (numeric_features as torch sparse CSR/COO tensor, `None`).
 
         """
         assert (
@@ -140,6 +221,26 @@ class TorchBasedLinearEstimator:
         data = convert_cupy_scipy_sparse_to_torch_float(data, dev_id)
         return data, None
 
+    def _get_split_idx(self, data: cp.ndarray) -> Tuple[cp.ndarray, cp.ndarray]:
+        """Get indices of categorical and numeric columns, computed once for given data shape and device.
+
+        Args:
+            data: Dense data.
+
+        Returns:
+            Indices of categorical and numeric features on device of data.
+
+        """
+        key = (data.shape[1], data.device.id)
+        cached = getattr(self, "_split_idx", None)
+        if cached is None or cached[0] != key:
+            cat_idx = np.asarray(self.categorical_idx["int"], dtype=np.int64)
+            num_idx = np.setdiff1d(np.arange(data.shape[1]), cat_idx).astype(np.int64)
+            with data.device:
+                self._split_idx = cached = (key, (cp.asarray(cat_idx), cp.asarray(num_idx)))
+
+        return cached[1]
+
     def _prepare_data_dense(self, data, dev_id: int = 0):
         """Prepare dense matrix.
 
@@ -153,28 +254,21 @@ class TorchBasedLinearEstimator:
 
         """
 
-        if 0 < len(self.categorical_idx["int"]) < data.shape[1]:
+        cat_idx = self.categorical_idx["int"]
+        # numeric only data is the most common case
+        if len(cat_idx) == 0:
+            data = _cupy_to_torch(data, cp.float32, dev_id)
+            return data, None
 
-            data_cat = torch.as_tensor(
-                data[:, self.categorical_idx["int"]].astype(cp.int32),
-                device=f"cuda:{dev_id}",
-            )
+        elif len(cat_idx) < data.shape[1]:
 
-            data = torch.as_tensor(
-                data[
-                    :,
-                    np.setdiff1d(np.arange(data.shape[1]), self.categorical_idx["int"]),
-                ].astype(cp.float32),
-                device=f"cuda:{dev_id}",
-            )
+            cat_idx, num_idx = self._get_split_idx(data)
+            data_cat = _cupy_to_torch(data[:, cat_idx], cp.int32, dev_id)
+            data = _cupy_to_torch(data[:, num_idx], cp.float32, dev_id)
             return data, data_cat
 
-        elif len(self.categorical_idx["int"]) == 0:
-            data = torch.as_tensor(data.astype(cp.float32), device=f"cuda:{dev_id}")
-            return data, None
-
         else:
-            data_cat = torch.as_tensor(data.astype(cp.int32), device=f"cuda:{dev_id}")
+            data_cat = _cupy_to_torch(data, cp.int32, dev_id)
             return None, data_cat
 
     def _optimize(
@@ -184,6 +278,7 @@ class TorchBasedLinearEstimator:
         y: torch.Tensor = None,
         weights: Optional[torch.Tensor] = None,
         c: float = 1.0,
+        max_iter: Optional[int] = None,
     ):
         """Optimize single model.
 
@@ -193,31 +288,33 @@ class TorchBasedLinearEstimator:
             y: Target values.
             weights: Item weights.
             c: Regularization coefficient.
+            max_iter: Maximum iterations of L-BFGS, ``self.max_iter`` if ``None``.
 
         """
         self.model.train()
         opt = optim.LBFGS(
             self.model.parameters(),
             lr=0.1,
-            max_iter=self.max_iter,
+            max_iter=self.max_iter if max_iter is None else max_iter,
             tolerance_change=self.tol,
             tolerance_grad=self.tol,
             line_search_fn="strong_wolfe",
         )
 
-        # keep history
-        results = []
+        # parameters under penalty are found once per optimization, not on each loss call
+        self._penalty_params = [y for (x, y) in self.model.named_parameters() if x != "bias"]
 
+        # loss stays on device, L-BFGS reads the values it needs by itself
         def closure():
             opt.zero_grad()
             output = self.model(data, data_cat)
-            loss = self._loss_fn(y, output, weights, c).cuda()
+            loss = self._loss_fn(y, output, weights, c)
             if loss.requires_grad:
                 loss.backward()
-            results.append(loss.item())
             return loss
 
-        opt.step(closure)
+        with _tf32_matmul(self.tf32):
+            opt.step(closure)
 
     def _loss_fn(
         self,
@@ -245,10 +342,8 @@ class TorchBasedLinearEstimator:
         if weights is not None:
             n = weights.sum()
 
-        all_params = torch.cat(
-            [y.view(-1) for (x, y) in self.model.named_parameters() if x != "bias"]
-        )
-        penalty = torch.norm(all_params, 2).pow(2) / 2 / n
+        # squared l2 norm without concatenation of all parameters
+        penalty = sum(y.pow(2).sum() for y in self._penalty_params) / 2 / n
         return loss + 0.5 / c * penalty
 
     def fit(
@@ -280,11 +375,9 @@ class TorchBasedLinearEstimator:
         data, data_cat = self._prepare_data(data, dev_id)
         if len(y.shape) == 1:
             y = y[:, cp.newaxis]
-        y = torch.as_tensor(y.astype(cp.float32), device=f"cuda:{dev_id}")
+        y = torch.as_tensor(y.astype(cp.float32), device=_cuda_device(dev_id))
         if weights is not None:
-            weights = torch.as_tensor(
-                weights.astype(cp.float32), device=f"cuda:{dev_id}"
-            )
+            weights = torch.as_tensor(weights.astype(cp.float32), device=_cuda_device(dev_id))
         if data_val is None and y_val is None:
             logger.warning(
                 "Validation data should be defined. No validation will be performed and C = 1 will be used"
@@ -294,17 +387,20 @@ class TorchBasedLinearEstimator:
             return self
         data_val, data_val_cat = self._prepare_data(data_val, dev_id)
         best_score = -np.inf
-        best_model = None
+        best_state = None
         es = 0
-        for c in self.cs:
-            self._optimize(data, data_cat, y, weights, c)
+        for n, c in enumerate(self.cs):
+            # next solves are warm started from the best weights, so they need fewer iterations
+            max_iter = self.max_iter if n == 0 else max(self.max_iter // 4, 1)
+            self._optimize(data, data_cat, y, weights, c, max_iter)
             val_pred = self._score(data_val, data_val_cat)
             score = self.metric(y_val, val_pred, weights_val)
             logger.info3("Linear model (gpu): C = {0} score = {1}".format(c, score))
             if score > best_score:
 
                 best_score = score
-                best_model = deepcopy(self.model)
+                # snapshot of weights on device instead of deepcopy of the whole module
+                best_state = {k: v.detach().clone() for k, v in self.model.state_dict().items()}
                 es = 0
             else:
 
@@ -313,7 +409,12 @@ class TorchBasedLinearEstimator:
             if es >= self.early_stopping:
                 break
 
-            self.model = best_model
+            if best_state is not None:
+                self.model.load_state_dict(best_state)
+
+        # loop may stop early with weights of the last C
+        if best_state is not None:
+            self.model.load_state_dict(best_state)
 
         return self
 
@@ -329,12 +430,15 @@ class TorchBasedLinearEstimator:
 
         """
         preds = None
-        with torch.set_grad_enabled(False):
+        with torch.set_grad_enabled(False), _tf32_matmul(self.tf32):
             self.model.eval()
-            preds = cp.asarray(self.model.predict(data, data_cat))
+            preds = self.model.predict(data, data_cat).detach()
         if preds.ndim > 1 and preds.shape[1] == 1:
-            preds = cp.squeeze(preds)
-        return preds
+            preds = preds.squeeze(1)
+        # zero copy view of torch output
+        if hasattr(cp, "from_dlpack"):
+            return cp.from_dlpack(preds)
+        return cp.fromDlpack(torch.utils.dlpack.to_dlpack(preds))
 
     def predict(self, data: cp.ndarray, dev_id: int = 0) -> cp.ndarray:
         """Inference phase.
@@ -383,6 +487,7 @@ class TorchBasedLogisticRegression(TorchBasedLinearEstimator):
         early_stopping: int = 2,
         loss=Optional[Callable],
         metric=Optional[Callable],
+        tf32: bool = False,
     ):
         """
         Args:
@@ -396,6 +501,7 @@ class TorchBasedLogisticRegression(TorchBasedLinearEstimator):
             early_stopping: maximum rounds without improving.
             loss: loss function. Format: loss(preds, true) -> loss_arr, assume reduction='none'.
             metric: metric function. Format: metric(y_true, y_preds, sample_weight = None) -> float (greater_is_better).
+            tf32: allow TF32 matmuls while training and scoring.
 
         """
         if output_size == 1:
@@ -419,9 +525,10 @@ class TorchBasedLogisticRegression(TorchBasedLinearEstimator):
             early_stopping,
             loss,
             metric,
+            tf32,
         )
         self.model = _model(
-            self.data_size - len(self.categorical_idx["int"]),
+            self._n_num,
             self.embed_sizes,
             self.output_size,
         ).cuda()
@@ -472,6 +579,7 @@ class TorchBasedLinearRegression(TorchBasedLinearEstimator):
         early_stopping: int = 2,
         loss=Optional[Callable],
         metric=Optional[Callable],
+        tf32: bool = False,
     ):
         """
         Args:
@@ -485,6 +593,7 @@ class TorchBasedLinearRegression(TorchBasedLinearEstimator):
             early_stopping: maximum rounds without improving.
             loss: loss function. Format: loss(preds, true) -> loss_arr, assume reduction='none'.
             metric: metric function. Format: metric(y_true, y_preds, sample_weight = None) -> float (greater_is_better).
+            tf32: allow TF32 matmuls while training and scoring.
 
         """
         if loss is None:
@@ -500,9 +609,10 @@ class TorchBasedLinearRegression(TorchBasedLinearEstimator):
             early_stopping,
             loss,
             metric,
+            tf32,
         )
         self.model = CatRegression(
-            self.data_size - len(self.categorical_idx["int"]),
+            self._n_num,
             self.embed_sizes,
             self.output_size,
         ).cuda()
@@ -3,7 +3,6 @@
 from typing import Callable
 from typing import Optional
 from typing import Union
-from typing import cast
 
 from ..dataset.base import LAMLDataset
 from ..dataset.np_pd_dataset import CSRSparseDataset
@@ -24,6 +23,11 @@ else:
 
 NpDataset = Union[CSRSparseDataset, NumpyDataset, PandasDataset]
 
+# iterator factory for each dataset type
+_ITER_DISPATCH = dict.fromkeys([PandasDataset, NumpyDataset, CSRSparseDataset], get_numpy_iterator)
+if torch.cuda.is_available():
+    _ITER_DISPATCH.update(dict.fromkeys([CupyDataset, CudfDataset, DaskCudfDataset], get_gpu_iterator))
+
 
 def create_validation_iterator(
     train: LAMLDataset,
@@ -52,15 +56,9 @@ def create_validation_iterator(
         New iterator.
 
     """
-    if type(train) in [PandasDataset, NumpyDataset, CSRSparseDataset]:
-        train = cast(NpDataset, train)
-        valid = cast(NpDataset, valid)
-        iterator = get_numpy_iterator(train, valid, n_folds, cv_iter)
-
-    elif type(train) in [CupyDataset, CudfDataset, DaskCudfDataset]:
-        train = cast(GpuDataset, train)
-        valid = cast(GpuDataset, valid)
-        iterator = get_gpu_iterator(train, valid, n_folds, cv_iter)
+    get_iterator = _ITER_DISPATCH.get(type(train))
+    if get_iterator is not None:
+        iterator = get_iterator(train, valid, n_folds, cv_iter)
 
     else:
         if valid is not None:
@@ -0,0 +1,28 @@
+import numpy as np
+import cudf
+import dask
+import dask_cudf
+
+from lightautoml_gpu.dataset.gpu.gpu_dataset import DaskCudfDataset
+from lightautoml_gpu.dataset.roles import NumericRole
+
+
+if __name__ == "__main__":
+    n = 10
+    df = cudf.DataFrame({"a": np.arange(n, dtype=np.float32)}, index=np.arange(n) * 2)
+    data = dask_cudf.from_cudf(df, npartitions=2)
+    roles = {"a": NumericRole(np.float32)}
+
+    # target with same divisions as data, but with rows reversed inside partitions
+    target = cudf.Series(df["a"].values * 100, index=df.index, name="target")
+    parts = [dask.delayed(part[::-1]) for part in (target.iloc[:5], target.iloc[5:])]
+    target = dask_cudf.from_delayed(parts, meta=target.head(0), divisions=data.divisions)
+    assert target.divisions == data.divisions
+
+    # target aligned with data
+    aligned = dask_cudf.from_cudf(cudf.Series(df["a"].values * 10, index=df.index, name="aligned"), npartitions=2)
+
+    ds = DaskCudfDataset(data, roles, target=target, group=aligned)
+    assert np.array_equal(ds.data.index.compute().values_host, np.arange(n))
+    assert np.allclose(ds.target.compute().values_host, np.arange(n) * 100)
+    assert np.allclose(ds.group.compute().values_host, np.arange(n) * 10)
@@ -0,0 +1,124 @@
+import numpy as np
+import cudf
+import cupy as cp
+import dask_cudf
+
+from lightautoml_gpu.dataset.gpu.gpu_dataset import SeqCudfDataset
+from lightautoml_gpu.dataset.gpu.gpu_dataset import SeqDaskCudfDataset
+from lightautoml_gpu.dataset.gpu.gpu_dataset import SeqIdx
+from lightautoml_gpu.dataset.gpu.gpu_dataset import _as_seq_idx
+from lightautoml_gpu.dataset.gpu.gpu_dataset import _first_rows
+from lightautoml_gpu.dataset.gpu.gpu_dataset import _gather_seq_idx
+from lightautoml_gpu.dataset.gpu.gpu_dataset import _seq_reduce
+from lightautoml_gpu.dataset.roles import NumericRole
+
+
+def gather_seq_idx_loop(seqs):
+    rows = []
+    idx_new = []
+    _c = 0
+    for i in seqs:
+        rows.extend(list(i))
+        idx_new.append(list(np.arange(len(i)) + _c))
+        _c += len(i)
+
+    return np.array(sorted(list(set(rows))), dtype=np.int64), idx_new
+
+
+if __name__ == "__main__":
+    np.random.seed(42)
+
+    # std of sequences of data with large offset and small spread
+    n, n_cols = 3000, 3
+    data = 3000 + 0.1 * (np.arange(n * n_cols, dtype=np.float64).reshape(n, n_cols) % 70)
+    seqs = [np.random.choice(n, np.random.randint(1, 50), replace=False) for _ in range(200)]
+    seq_idx = SeqIdx.from_seqs(seqs)
+
+    out = cp.asnumpy(_seq_reduce(cp.asarray(data), seq_idx, "std"))
+    expected = np.array([np.std(data[seq]) for seq in seqs])
+    assert np.allclose(out, expected, rtol=1e-7, atol=1e-9)
+
+    out = cp.asnumpy(_seq_reduce(cp.asarray(data, dtype=np.float32), seq_idx, "std"))
+    expected = np.array([np.std(data.astype(np.float32)[seq].astype(np.float64)) for seq in seqs])
+    assert np.allclose(out, expected, rtol=1e-4, atol=1e-6)
+
+    for how in ("sum", "mean", "max", "min"):
+        out = cp.asnumpy(_seq_reduce(cp.asarray(data), seq_idx, how))
+        expected = np.array([getattr(np, how)(data[seq]) for seq in seqs])
+        assert np.allclose(out, expected)
+
+    # first frame keeps sequences at their positions, empty sequences give nulls
+    df = cudf.DataFrame({"a": np.arange(10, dtype=np.float32), "b": np.arange(10, dtype=np.float32) * 10})
+    roles = {"a": NumericRole(np.float32), "b": NumericRole(np.float32)}
+    for idx in (np.array([[7, 8], [], [2, 3], [0]], dtype=object), np.array([[7], [np.nan], [2], [0]])):
+        ds = SeqDaskCudfDataset(dask_cudf.from_cudf(df, npartitions=3), roles=roles, idx=idx)
+        out = ds.get_first_frame().data.compute().to_pandas()
+        assert np.allclose(out["a"].values, [7, np.nan, 2, 0], equal_nan=True)
+        assert np.allclose(out["b"].values, [70, np.nan, 20, 0], equal_nan=True)
+
+        out = ds.get_first_frame((slice(None), "b")).data.compute().to_pandas()
+        assert list(out.columns) == ["b"]
+        assert np.allclose(out["b"].values, [70, np.nan, 20, 0], equal_nan=True)
+
+    # apply_func addresses rows by positions, also in a sliced dataset with original index labels
+    idx = np.array([[5, 6], [2, 3, 4], [9, 0], [1], [7, 8]], dtype=object)
+    ds = SeqDaskCudfDataset(dask_cudf.from_cudf(df, npartitions=3), roles=roles, idx=idx)
+    out = ds.apply_func((slice(None), "a"), cp.sum).compute().to_pandas()
+    assert np.allclose(out.values[:, 0], [np.sum(df["a"].values_host[x]) for x in idx])
+
+    # slicing keeps rows of sequences in sorted order, so these rows give same sequences,
+    # the first one spans two partitions of the sliced data
+    rows = [1, 0, 4]
+    sliced = ds[rows]
+    for cols in (None, "a"):
+        out = sliced.apply_func((slice(None), cols), cp.max).compute().to_pandas()
+        data = df.values_host if cols is None else df[cols].values_host
+        assert np.allclose(out.values[:, 0], [np.max(data[idx[i]]) for i in rows])
+
+    # SeqIdx gives same sequences as ragged array, including empty ones
+    seqs = np.array([[3, 1], [], [5], [], [0, 2, 4]], dtype=object)
+    seq_idx = SeqIdx.from_seqs(seqs)
+    assert len(seq_idx) == len(seqs)
+    assert np.array_equal(seq_idx.lengths, [len(x) for x in seqs])
+    assert all(np.array_equal(x, y) for x, y in zip(seq_idx, seqs))
+    assert np.array_equal(seq_idx[-1], seqs[-1]) and len(seq_idx[1]) == 0
+
+    for k in ([4, 0, 1, 0], slice(1, 4), np.array([True, False, True, True, False]), np.arange(5)[::-1]):
+        sub = seq_idx[k]
+        assert all(np.array_equal(x, y) for x, y in zip(sub, seqs[k]))
+        assert len(sub) == len(seqs[k])
+
+    square = np.array([[1, 2], [0, 4], [3, 3]])
+    assert all(np.array_equal(x, y) for x, y in zip(SeqIdx.from_seqs(square), square))
+    assert len(SeqIdx.from_seqs([[], []]).values) == 0
+
+    # first rows, nan for empty sequences
+    assert np.allclose(_first_rows(seq_idx, [4, 1, 0, 3]), [0, np.nan, 3, np.nan], equal_nan=True)
+    assert np.array_equal(_first_rows(seq_idx, [2, 0]), [5, 3])
+
+    # idx with [nan] entries is kept as is
+    nan_idx = np.array([[2], [np.nan], [0]])
+    assert _as_seq_idx(nan_idx) is nan_idx
+    assert isinstance(_as_seq_idx(seqs), SeqIdx)
+    assert np.allclose(_first_rows(nan_idx, [1, 0, 2]), [np.nan, 2, 0], equal_nan=True)
+
+    # gathered rows and new index are same as built by loop over sequences
+    for k in ([4, 0, 1], [2, 2, 3], [1, 3], slice(None)):
+        rows, idx_new = _gather_seq_idx(seqs[k])
+        rows_loop, idx_loop = gather_seq_idx_loop(seqs[k])
+        assert np.array_equal(rows, rows_loop)
+        assert len(idx_new) == len(idx_loop)
+        assert all(np.array_equal(x, y) for x, y in zip(SeqIdx.from_seqs(idx_new), idx_loop))
+
+    # concatenation of sequential datasets keeps index of sequences
+    ds = SeqCudfDataset(df, roles=roles, idx=seqs)
+    out = SeqCudfDataset.concat([ds[:, "a"], ds[:, "b"]])
+    assert list(out.features) == ["a", "b"]
+    assert all(np.array_equal(x, y) for x, y in zip(SeqIdx.from_seqs(out.idx), seqs))
+    out = out.get_first_frame().data.to_pandas()
+    assert np.allclose(out["b"].values, [30, np.nan, 50, np.nan, 0], equal_nan=True)
+
+    # first frame does not share roles with sequential dataset
+    ds = SeqCudfDataset(df, roles={"a": NumericRole(np.float32), "b": NumericRole(np.float64)}, idx=seqs)
+    ds.get_first_frame().to_cupy()
+    assert ds.roles["a"].dtype == np.float32
@@ -0,0 +1,57 @@
+import numpy as np
+import cupy as cp
+from cupyx.scipy import sparse as sparse_cupy
+
+from lightautoml_gpu.ml_algo.torch_based.gpu import linear_model_cupy
+from lightautoml_gpu.ml_algo.torch_based.gpu.linear_model_cupy import TorchBasedLinearRegression
+from lightautoml_gpu.ml_algo.torch_based.gpu.linear_model_cupy import TorchBasedLogisticRegression
+
+
+def gen_regression(n, n_num):
+    x = np.random.random((n, n_num)).astype(np.float32)
+    y = x @ np.random.random(n_num).astype(np.float32) + np.random.random(n).astype(np.float32) * 0.1
+    return x, y
+
+
+if __name__ == "__main__":
+    np.random.seed(42)
+    n, n_num = 2000, 10
+    x, y = gen_regression(n, n_num)
+    x_train, y_train = cp.asarray(x[:1500]), cp.asarray(y[:1500])
+    x_val, y_val = cp.asarray(x[1500:]), cp.asarray(y[1500:])
+
+    # early stopping keeps weights of the best C, not of the last one
+    scores = iter([1.0, 0.5, 0.2, 0.1, 0.0])
+    val_preds = []
+
+    def metric(y_true, y_pred, sample_weight=None):
+        val_preds.append(cp.asnumpy(y_pred).copy())
+        return next(scores)
+
+    model = TorchBasedLinearRegression(
+        data_size=n_num, categorical_idx={"int": []}, cs=(0.001, 1.0, 10.0, 20.0, 50.0),
+        early_stopping=2, loss=None, metric=metric
+    )
+    model.fit(x_train, y_train, data_val=x_val, y_val=y_val)
+    assert len(val_preds) == 3
+    assert not np.allclose(val_preds[0], val_preds[-1])
+    assert np.allclose(cp.asnumpy(model.predict(x_val)), val_preds[0], rtol=1e-5, atol=1e-6)
+
+    # sparse input gives same model as dense one, both for CSR and COO tensors
+    x_sparse = x * (np.random.random(x.shape) > 0.7)
+    y_bin = (y > np.median(y)).astype(np.float32)
+    for use_csr in sorted({False, linear_model_cupy._TORCH_SPARSE_CSR}):
+        linear_model_cupy._TORCH_SPARSE_CSR = use_csr
+        tensor = linear_model_cupy.convert_cupy_scipy_sparse_to_torch_float(sparse_cupy.csr_matrix(cp.asarray(x_sparse)), 0)
+        assert tensor.is_cuda and np.allclose(tensor.to_dense().cpu().numpy(), x_sparse)
+
+        for model_cls, target in ((TorchBasedLinearRegression, y), (TorchBasedLogisticRegression, y_bin)):
+            coefs = []
+            preds = []
+            for data in (cp.asarray(x_sparse), sparse_cupy.csr_matrix(cp.asarray(x_sparse))):
+                model = model_cls(data_size=n_num, categorical_idx={"int": []}, cs=(1.0,), loss=None, metric=None)
+                model.fit(data, cp.asarray(target))
+                coefs.append(model.model.linear.weight.detach().cpu().numpy())
+                preds.append(cp.asnumpy(model.predict(data)))
+            assert np.allclose(coefs[0], coefs[1], rtol=1e-3, atol=1e-4)
+            assert np.allclose(preds[0], preds[1], rtol=1e-3, atol=1e-4)